@@ -3,42 +3,40 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 
-def run_monte_carlo_simulation(initial_capital, monthly_contribution, years, 
-                               expected_return, volatility, num_simulations, annual_fee, contribution_increase_rate):
-    """
-    Performs a Monte Carlo simulation for an investment portfolio.
-    """
-    monthly_return = expected_return / 12
-    monthly_volatility = volatility / np.sqrt(12)
-    num_months = years * 12
-    
-    all_simulation_paths = np.zeros((num_months + 1, num_simulations))
-    all_simulation_paths[0] = initial_capital
-
-    invested_capital_path = np.zeros(num_months + 1)
-    invested_capital_path[0] = initial_capital
-
-    for i in range(num_simulations):
-        capital = initial_capital
-        current_monthly_contribution = monthly_contribution
-        total_invested = initial_capital
+from simulator import (
+    SCIPY_AVAILABLE,
+    SimulationCache,
+    cached_growth_factors,
+    calculate_invested_capital,
+    extend_growth_factors,
+    expected_final_value,
+    final_value_statistics,
+    goal_thresholds,
+    inflation_discount_factors,
+    iter_cached_adaptive_simulation,
+    iter_cached_streaming_simulation,
+    make_rng,
+    preview_statistics,
+    quantile_standard_errors,
+    required_monthly_contribution,
+    shock_cache_stats,
+    success_probability,
+    superpose_yearly_values,
+    variance_reduced_statistics,
+)
+from simulator.charts import BAND_COLOR, build_fan_chart, build_paths_chart, histogram_trace, percentile_bands
+from simulator.adaptive import DEFAULT_MAX_SIMULATIONS
+from simulator.streaming import DEFAULT_PERCENTILES, MAX_IN_MEMORY_SIMULATIONS
 
-        for month in range(num_months):
-            random_return = np.random.normal(monthly_return, monthly_volatility)
-            capital *= (1 + random_return)
-            
-            capital += current_monthly_contribution
-            if i == 0:
-                total_invested += current_monthly_contribution
-                invested_capital_path[month + 1] = total_invested
-            
-            if (month + 1) % 12 == 0:
-                capital *= (1 - annual_fee)
-                current_monthly_contribution *= (1 + contribution_increase_rate)
+NUM_SAMPLE_PATHS = 20
+# Paths used to solve for the required contribution when the run itself streams
+MAX_SOLVER_SIMULATIONS = 100_000
 
-            all_simulation_paths[month + 1, i] = capital
 
-    return all_simulation_paths, invested_capital_path
+@st.cache_resource
+def get_simulation_cache():
+    # One cache per server process, shared by all sessions
+    return SimulationCache()
 
 
 # --- Streamlit App ---
@@ -51,6 +49,12 @@ st.sidebar.header("Parameters")
 initial_capital = st.sidebar.number_input("Seed capital (€)", min_value=0, value=10000, step=1000)
 monthly_contribution = st.sidebar.number_input("Monthly savings rate (€)", min_value=0, value=500, step=50)
 years = st.sidebar.slider("Investment horizon (years)", min_value=1, max_value=50, value=30, step=1)
+goal_amount = st.sidebar.number_input("Goal amount (€, 0 = no goal)", min_value=0, value=0, step=10000,
+                                      help="In today's money if inflation is set")
+goal_year = st.sidebar.number_input("Reach the goal after (years)", min_value=1, max_value=years, value=years,
+                                    step=1, disabled=goal_amount == 0)
+goal_confidence = st.sidebar.slider("Required probability of reaching the goal (%)", min_value=50, max_value=99,
+                                    value=90, step=1, disabled=goal_amount == 0) / 100
 
 st.sidebar.markdown("---")
 
@@ -63,77 +67,283 @@ inflation_rate = st.sidebar.slider("Average inflation (%)", min_value = 0.0, max
 annual_fee = st.sidebar.number_input("Annual fees (%)", min_value = 0.0, max_value = 5.0, step = 0.01, value=5.0)/100
 
 st.sidebar.markdown("---")
-num_simulations = st.sidebar.select_slider("Number of simulations", options=[100, 500, 1000, 5000], value=1000)
+num_simulations = st.sidebar.select_slider("Number of simulations", options=[100, 500, 1000, 5000, 10000, 100000, 1000000], value=1000)
+adaptive = st.sidebar.checkbox(
+    "Choose number of simulations automatically",
+    help="Adds simulations until the median and the 10% scenario are known to the target precision"
+)
+target_precision = st.sidebar.slider("Target precision (± %)", min_value=0.25, max_value=5.0, value=1.0, step=0.25,
+                                     disabled=not adaptive) / 100
+seed = st.sidebar.number_input("Random seed", min_value=0, value=42, step=1)
+variance_reduction = st.sidebar.checkbox(
+    "Variance reduction",
+    help="Antithetic paths and a control variate: more accurate metrics for the same number of simulations"
+)
+quasi_random = st.sidebar.checkbox(
+    "Quasi-random paths (Sobol)",
+    help="Spreads the paths more evenly than random sampling, so the percentiles converge with fewer simulations",
+    disabled=not SCIPY_AVAILABLE
+)
+streaming = adaptive or num_simulations > MAX_IN_MEMORY_SIMULATIONS
+chart_mode = st.sidebar.radio(
+    "Chart", ["Percentile bands", "Individual paths"], disabled=streaming,
+    help=f"Individual paths are only kept up to {MAX_IN_MEMORY_SIMULATIONS:,} simulations; "
+         "above that and with automatic simulations the percentile bands are shown"
+)
+show_sample_paths = st.sidebar.checkbox("Show sample paths", value=True)
 
-if st.sidebar.button("Start simulation"):
+simulation_cache = get_simulation_cache()
+
+
+def stop_simulation():
+    # Runs before the rerun that the Stop button triggers, which interrupts the running simulation
+    st.session_state["simulation_stopped"] = True
+
+def show_results(final_values, percentiles, band_values, invested_capital_path, title_suffix, y_axis_label,
+                 yearly_results=None, standard_errors=None, final_statistics=None, goal_probability=None):
+    """
+    Shows the metrics and both charts. yearly_results (years + 1, num_simulations) is only available
+    in in-memory mode; standard_errors (for the 10th, 50th and 90th percentile) only while a run is in progress.
+    final_statistics overrides the metrics computed from final_values, e.g. with variance-reduced estimates.
+    goal_probability (years + 1) is the probability of being at or above the goal at the end of every year.
+    """
+    total_invested = invested_capital_path[-1]
     
-    with st.spinner("Simulations are running... This may take a moment."):
-        simulation_results, invested_capital_path = run_monte_carlo_simulation(
-            initial_capital, monthly_contribution, years, 
-            expected_return, volatility, num_simulations, annual_fee, contribution_increase_rate
-        )
-        
-        title_suffix = ""
-        y_axis_label = "Portfolio value (€)"
-
-        if inflation_rate > 0:
-            months = np.arange(years * 12 + 1)
-            discount_factors = (1 + inflation_rate / 12) ** months
-            simulation_results = simulation_results / discount_factors[:, np.newaxis]
-            invested_capital_path = invested_capital_path / discount_factors
-            title_suffix = " (inflation-adjusted, in today's money)"
-            y_axis_label = "Portfolio value (€, in today's money)"
-
-        final_values = simulation_results[-1]
-        
-        st.header(f"Simulation results{title_suffix}")
-        
-        total_invested = invested_capital_path[-1]
-        
-        median_final = np.median(final_values)
-        worst_case = np.percentile(final_values, 10)
-        best_case = np.percentile(final_values, 90)
-
-        # --- HINZUGEFÜGT: Berechnung der letzten Rate ---
-        # Berechnet die Rate für das letzte Jahr der Einzahlung
-        last_rate = monthly_contribution * ((1 + contribution_increase_rate) ** (years - 1))
-
-        # --- HINZUGEFÜGT: Fünf Spalten für die Metriken ---
-        col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("Most probable final value (median)", f"€ {median_final:,.0f}")
-        col2.metric("Worst-case scenario (10%)", f"€ {worst_case:,.0f}")
-        col3.metric("Better scenario (90%)", f"€ {best_case:,.0f}")
-        col4.metric("Total Invested", f"€ {total_invested:,.0f}")
-        # --- HINZUGEFÜGT: Anzeige der letzten Rate ---
-        col5.metric("Last monthly rate", f"€ {last_rate:,.0f}")
-        
-        # --- Chart 1: Simulation Paths ---
-        fig_paths = go.Figure()
-        x_axis_years = np.arange(0, years + 1, 1)
+    if final_statistics is None:
+        final_statistics = final_value_statistics(final_values)
+    median_final = final_statistics["median_final"]
+    worst_case = final_statistics["worst_case"]
+    best_case = final_statistics["best_case"]
+
+    # --- HINZUGEFÜGT: Berechnung der letzten Rate ---
+    # Berechnet die Rate für das letzte Jahr der Einzahlung
+    last_rate = monthly_contribution * ((1 + contribution_increase_rate) ** (years - 1))
+
+    deltas = [None, None, None]
+    if standard_errors is not None:
+        worst_case_error, median_error, best_case_error = standard_errors
+        deltas = [f"± € {error:,.0f}" for error in (median_error, worst_case_error, best_case_error)]
+
+    # --- HINZUGEFÜGT: Fünf Spalten für die Metriken ---
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Most probable final value (median)", f"€ {median_final:,.0f}", deltas[0], delta_color="off")
+    col2.metric("Worst-case scenario (10%)", f"€ {worst_case:,.0f}", deltas[1], delta_color="off")
+    col3.metric("Better scenario (90%)", f"€ {best_case:,.0f}", deltas[2], delta_color="off")
+    col4.metric("Total Invested", f"€ {total_invested:,.0f}")
+    # --- HINZUGEFÜGT: Anzeige der letzten Rate ---
+    col5.metric("Last monthly rate", f"€ {last_rate:,.0f}")
+    
+    # --- Chart 1: Simulation Paths ---
+    x_axis_years = np.arange(0, years + 1, 1)
+
+    if yearly_results is None:
+        # Individual paths are not kept in streaming mode
+        fig_paths = build_fan_chart(x_axis_years, percentiles, band_values)
+    elif chart_mode == "Individual paths":
+        fig_paths = build_paths_chart(x_axis_years, yearly_results)
+    else:
+        sample_paths = None
+        if show_sample_paths:
+            sample_indices = make_rng(seed).choice(yearly_results.shape[1],
+                                                   size=min(NUM_SAMPLE_PATHS, yearly_results.shape[1]),
+                                                   replace=False)
+            sample_paths = yearly_results[:, sample_indices]
+        fig_paths = build_fan_chart(x_axis_years, percentiles, band_values, sample_paths)
+
+    fig_paths.add_trace(go.Scatter(
+        x=x_axis_years,
+        y=invested_capital_path[::12],
+        mode='lines',
+        line=dict(width=2, color='black', dash='dash'),
+        name='Total Invested'
+    ))
         
-        for i in range(num_simulations):
-            fig_paths.add_trace(go.Scatter(
-                x=x_axis_years, 
-                y=simulation_results[::12, i],
-                mode='lines', 
-                line=dict(width=0.5, color='lightblue'),
-                showlegend=False
-            ))
-            
-        fig_paths.add_trace(go.Scatter(
+    fig_paths.update_layout(title=f"Possible portfolio developments{title_suffix}",
+                          xaxis_title="Years", yaxis_title=y_axis_label)
+    st.plotly_chart(fig_paths, use_container_width=True)
+    
+    # --- Chart 2: Histogram ---
+    fig_hist = go.Figure(data=[histogram_trace(final_values)])
+    fig_hist.update_layout(title=f"Distribution of possible final values{title_suffix}",
+                           xaxis_title=f"Final value{title_suffix}", yaxis_title="Number of simulations")
+    st.plotly_chart(fig_hist, use_container_width=True)
+
+    # --- Chart 3: Probability of reaching the goal ---
+    if goal_probability is not None:
+        st.metric(f"Probability of having € {goal_amount:,.0f} after {goal_year} years",
+                  f"{goal_probability[goal_year]:.0%}")
+        fig_goal = go.Figure(data=[go.Scatter(
             x=x_axis_years,
-            y=invested_capital_path[::12],
+            y=goal_probability,
             mode='lines',
-            line=dict(width=2, color='black', dash='dash'),
-            name='Total Invested'
-        ))
-            
-        fig_paths.update_layout(title=f"Possible portfolio developments{title_suffix}",
-                              xaxis_title="Years", yaxis_title=y_axis_label)
-        st.plotly_chart(fig_paths, use_container_width=True)
-        
-        # --- Chart 2: Histogram ---
-        fig_hist = go.Figure(data=[go.Histogram(x=final_values, nbinsx=100, name="Frequency")])
-        fig_hist.update_layout(title=f"Distribution of possible final values{title_suffix}",
-                               xaxis_title=f"Final value{title_suffix}", yaxis_title="Number of simulations")
-        st.plotly_chart(fig_hist, use_container_width=True)
\ No newline at end of file
+            line=dict(width=2, color=BAND_COLOR.format(opacity=1)),
+            name='Probability of reaching the goal'
+        )])
+        fig_goal.add_vline(x=goal_year, line=dict(dash='dash', color='black'))
+        fig_goal.update_layout(title=f"Probability of having reached € {goal_amount:,.0f}{title_suffix}",
+                               xaxis_title="Years", yaxis_title="Probability", yaxis_tickformat=".0%",
+                               yaxis_range=[0, 1])
+        st.plotly_chart(fig_goal, use_container_width=True)
+
+
+if st.sidebar.button("Start simulation"):
+    
+    invested_capital_path = calculate_invested_capital(
+        initial_capital, monthly_contribution, years, contribution_increase_rate
+    )
+
+    title_suffix = ""
+    y_axis_label = "Portfolio value (€)"
+    discount_factors = inflation_discount_factors(years, inflation_rate)
+    if inflation_rate > 0:
+        invested_capital_path = invested_capital_path / discount_factors
+        title_suffix = " (inflation-adjusted, in today's money)"
+        y_axis_label = "Portfolio value (€, in today's money)"
+
+    st.header(f"Simulation results{title_suffix}")
+
+    # The engine counts the paths at or above the goal month by month, in nominal terms
+    goal = goal_thresholds(goal_amount, years, inflation_rate) if goal_amount > 0 else None
+    final_statistics = None
+    if variance_reduction:
+        # Known expectation of the final value, the control variate, in the units shown
+        expected_value = expected_final_value(initial_capital, monthly_contribution, years, expected_return,
+                                              annual_fee, contribution_increase_rate) / discount_factors[-1]
+
+    if streaming:
+        # Streaming mode: results are shown after every batch and converge while the run continues.
+        # Stop keeps the latest interim results on screen; changing any input discards them.
+        progress_bar = st.progress(0.0)
+        stop_placeholder = st.empty()
+        stop_placeholder.button("Stop", on_click=stop_simulation,
+                                help="Stops the simulation and keeps the results computed so far")
+        results_placeholder = st.empty()
+        if adaptive:
+            simulation_summaries = iter_cached_adaptive_simulation(
+                simulation_cache, initial_capital, monthly_contribution, years,
+                expected_return, volatility, annual_fee, contribution_increase_rate, seed, target_precision,
+                goal=goal, antithetic=variance_reduction, quasi_random=quasi_random
+            )
+        else:
+            simulation_summaries = iter_cached_streaming_simulation(
+                simulation_cache, initial_capital, monthly_contribution, years,
+                expected_return, volatility, num_simulations, annual_fee, contribution_increase_rate, seed,
+                goal=goal, antithetic=variance_reduction, quasi_random=quasi_random
+            )
+        try:
+            for simulation_summary in simulation_summaries:
+                num_completed = simulation_summary["num_completed"]
+                # Percentiles scale with a positive factor, so the summaries can be discounted directly
+                final_values = simulation_summary["final_values"] / discount_factors[-1]
+                year_percentiles = simulation_summary["year_percentiles"] / discount_factors[::12]
+                if adaptive:
+                    finished = simulation_summary["converged"] or num_completed == DEFAULT_MAX_SIMULATIONS
+                    precision = simulation_summary["precision"].max()
+                    progress = min(1.0, target_precision / precision)
+                    progress_text = f"{num_completed:,} simulations, precision ± {precision:.2%}"
+                else:
+                    finished = num_completed == num_simulations
+                    progress = num_completed / num_simulations
+                    progress_text = f"{num_completed:,} of {num_simulations:,} simulations"
+                goal_probability = None
+                if goal is not None:
+                    # Counted monthly by the engine; shown at year ends like the in-memory mode
+                    goal_probability = simulation_summary["success_probability"][::12]
+                standard_errors = None
+                if not finished:
+                    standard_errors = quantile_standard_errors(final_values, [0.1, 0.5, 0.9])
+                elif variance_reduction:
+                    # The antithetic pairs lie within each chunk, so the control variate treats the paths as
+                    # independent and the reported gain only counts the control variate
+                    final_statistics = variance_reduced_statistics(final_values, expected_value)
+                progress_bar.progress(progress, text=progress_text)
+                results = dict(final_values=final_values, percentiles=simulation_summary["percentiles"],
+                               band_values=year_percentiles, invested_capital_path=invested_capital_path,
+                               title_suffix=title_suffix, y_axis_label=y_axis_label, standard_errors=standard_errors,
+                               final_statistics=final_statistics, goal_probability=goal_probability)
+                st.session_state["interim_results"] = (progress_text, results)
+                with results_placeholder.container():
+                    show_results(**results)
+        finally:
+            # Closing the generator cancels the chunks that have not started yet
+            simulation_summaries.close()
+        stop_placeholder.empty()
+        progress_bar.empty()
+        st.session_state.pop("interim_results", None)
+        if adaptive:
+            st.caption(f"{num_completed:,} simulations were needed for a precision of ± {precision:.2%}.")
+    else:
+        with st.spinner("Simulations are running... This may take a moment."):
+            # The charts only show yearly values, which follow linearly from the cached growth factors,
+            # so changing the capital or contributions does not rerun the simulation
+            growth_factors = cached_growth_factors(
+                simulation_cache, years, expected_return, volatility, num_simulations, annual_fee, seed,
+                antithetic=variance_reduction, quasi_random=quasi_random
+            )
+            yearly_results = superpose_yearly_values(
+                growth_factors, initial_capital, monthly_contribution, contribution_increase_rate
+            )
+            if inflation_rate > 0:
+                yearly_results = yearly_results / discount_factors[::12, np.newaxis]
+            if variance_reduction:
+                final_statistics = variance_reduced_statistics(yearly_results[-1], expected_value, antithetic=True)
+            band_values = percentile_bands(yearly_results, DEFAULT_PERCENTILES)
+            goal_probability = None
+            if goal_amount > 0:
+                # The growth factors only resolve year ends, so this counts the yearly rows that are displayed
+                # anyway (years + 1 rows of at most MAX_IN_MEMORY_SIMULATIONS), already in today's money
+                goal_probability = success_probability(yearly_results, goal_amount)
+            show_results(yearly_results[-1], DEFAULT_PERCENTILES, band_values, invested_capital_path,
+                         title_suffix, y_axis_label, yearly_results=yearly_results, final_statistics=final_statistics,
+                         goal_probability=goal_probability)
+
+    if final_statistics is not None:
+        gains = final_statistics["effective_sample_size_gain"]
+        st.caption(
+            f"Variance reduction is worth about {gains['median_final']:.1f}x the simulations for the median, "
+            f"{gains['worst_case']:.1f}x for the 10% and {gains['best_case']:.1f}x for the 90% scenario."
+        )
+
+    if goal is not None:
+        # The final values are linear in the contribution, so solving only needs the cached growth factors.
+        # Streaming runs draw them year by year rather than holding a shock matrix for all their paths
+        if streaming:
+            growth_factors = cached_growth_factors(
+                simulation_cache, years, expected_return, volatility,
+                min(num_simulations, MAX_SOLVER_SIMULATIONS), annual_fee, seed, cache_shocks=False
+            )
+        required_contribution = required_monthly_contribution(
+            extend_growth_factors(growth_factors, goal_year, expected_return, volatility, annual_fee),
+            initial_capital, goal[goal_year * 12], goal_confidence, contribution_increase_rate
+        )
+        st.metric(f"Monthly savings needed for a {goal_confidence:.0%} probability of reaching "
+                  f"€ {goal_amount:,.0f} after {goal_year} years",
+                  f"€ {required_contribution:,.0f}" if np.isfinite(required_contribution) else "not reachable")
+elif st.session_state.pop("simulation_stopped", False) and "interim_results" in st.session_state:
+    progress_text, results = st.session_state.pop("interim_results")
+    st.header(f"Simulation results{results['title_suffix']}")
+    st.caption(f"Stopped after {progress_text}.")
+    show_results(**results)
+else:
+    # Instant approximation while the inputs are being adjusted; the Monte Carlo run starts with the button
+    preview = preview_statistics(initial_capital, monthly_contribution, years, expected_return, volatility,
+                                 annual_fee, contribution_increase_rate)
+    discount = inflation_discount_factors(years, inflation_rate)[-1]
+    preview_suffix = " (inflation-adjusted, in today's money)" if inflation_rate > 0 else ""
+    st.header(f"Quick estimate{preview_suffix}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Most probable final value (median)", f"≈ € {preview['median_final'] / discount:,.0f}")
+    col2.metric("Worst-case scenario (10%)", f"≈ € {preview['worst_case'] / discount:,.0f}")
+    col3.metric("Better scenario (90%)", f"≈ € {preview['best_case'] / discount:,.0f}")
+    st.caption("Approximated without simulating. Press \"Start simulation\" for the full Monte Carlo results.")
+
+cache_stats = simulation_cache.stats()
+st.sidebar.caption(
+    f"Result cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+    f"{cache_stats['entries']} entries ({cache_stats['size_mb']:,.0f} MB)"
+)
+shock_stats = shock_cache_stats()
+st.sidebar.caption(
+    f"Shock cache: {shock_stats['hits']} hits, {shock_stats['misses']} misses, "
+    f"{shock_stats['entries']} entries ({shock_stats['size_mb']:,.0f} MB)"
+)
@@ -0,0 +1,94 @@
+"""
+Error versus number of paths for pseudo-random and quasi-random (scrambled Sobol) shocks.
+
+Every estimator is run with --replications independent seeds per path count. The error of a percentile is
+its root-mean-square deviation from a reference value computed with many more quasi-random paths,
+relative to that reference:
+
+    python benchmarks/qmc_convergence.py --output convergence.json
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from simulator import (  # noqa: E402
+    SCIPY_AVAILABLE,
+    compute_growth_factors,
+    sobol_normal_shocks,
+    superpose_final_values,
+)
+from run_benchmarks import PARAMETERS  # noqa: E402
+
+DEFAULT_PATH_COUNTS = [2**k for k in range(8, 15)]
+DEFAULT_PERCENTILES = (10, 50, 90)
+REFERENCE_PATHS = 2**16
+
+
+def final_values(years, num_simulations, seed, method):
+    """
+    Simulates the final values with shocks of the given method: "pseudo", or a Sobol ordering such as "bridge".
+    """
+    shocks = None
+    if method != "pseudo":
+        shocks = sobol_normal_shocks(seed, years * 12, num_simulations, ordering=method)
+    growth_factors = compute_growth_factors(years, PARAMETERS["expected_return"], PARAMETERS["volatility"],
+                                            num_simulations, PARAMETERS["annual_fee"], seed, shocks=shocks)
+    return superpose_final_values(growth_factors, PARAMETERS["initial_capital"],
+                                  PARAMETERS["monthly_contribution"], PARAMETERS["contribution_increase_rate"])
+
+
+def reference_percentiles(years, percentiles, num_batches=8):
+    """
+    Averages the percentiles of several independently scrambled runs with REFERENCE_PATHS paths each.
+    """
+    return np.mean([
+        np.percentile(final_values(years, REFERENCE_PATHS, 10_000 + batch, "bridge"), percentiles)
+        for batch in range(num_batches)
+    ], axis=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simulations", type=int, nargs="+", default=DEFAULT_PATH_COUNTS)
+    parser.add_argument("--years", type=int, default=30)
+    parser.add_argument("--replications", type=int, default=20)
+    parser.add_argument("--methods", nargs="+", default=["pseudo", "bridge", "pca", "none"],
+                        help='"pseudo" for pseudo-random shocks, otherwise a Sobol ordering')
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    if not SCIPY_AVAILABLE:
+        parser.error("quasi-random shocks require scipy")
+
+    reference = reference_percentiles(args.years, DEFAULT_PERCENTILES)
+    print(f"{'method':<8}{'simulations':>12}" + "".join(f"{f'p{p} error':>12}" for p in DEFAULT_PERCENTILES))
+
+    results = []
+    for method in args.methods:
+        for num_simulations in args.simulations:
+            estimates = np.array([
+                np.percentile(final_values(args.years, num_simulations, seed, method), DEFAULT_PERCENTILES)
+                for seed in range(args.replications)
+            ])
+            errors = np.sqrt(np.mean((estimates / reference - 1) ** 2, axis=0))
+            print(f"{method:<8}{num_simulations:>12}" + "".join(f"{error:>12.3%}" for error in errors))
+            results.append({
+                "method": method,
+                "num_simulations": num_simulations,
+                "years": args.years,
+                "relative_rmse": dict(zip(map(str, DEFAULT_PERCENTILES), errors.tolist())),
+            })
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"reference": dict(zip(map(str, DEFAULT_PERCENTILES), reference.tolist())),
+                       "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Benchmarks for the simulation engine and the dashboard pipeline.
+
+Times the simulation engine, the dashboard's growth factors, inflation adjustment, percentile statistics and
+figure construction for a grid of simulation counts and horizons, and writes the results as JSON for comparing
+commits:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from simulator import (  # noqa: E402
+    BACKENDS,
+    SimulationCache,
+    cached_growth_factors,
+    final_value_statistics,
+    inflation_discount_factors,
+    run_monte_carlo_simulation,
+    run_streaming_simulation,
+    superpose_yearly_values,
+)
+from simulator.charts import build_fan_chart, percentile_bands  # noqa: E402
+from simulator.streaming import DEFAULT_PERCENTILES, MAX_IN_MEMORY_SIMULATIONS  # noqa: E402
+
+DEFAULT_SIMULATIONS = [100, 1000, 10000, 100000, 1000000]
+DEFAULT_YEARS = [1, 10, 30, 50]
+
+PARAMETERS = dict(
+    initial_capital=10000,
+    monthly_contribution=500,
+    expected_return=0.07,
+    volatility=0.15,
+    annual_fee=0.002,
+    contribution_increase_rate=0.02,
+)
+INFLATION_RATE = 0.02
+
+
+def measure(function, *args, **kwargs):
+    """
+    Runs function once and returns (result, wall time in seconds, peak traced memory in bytes).
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def record(stage, num_simulations, years, elapsed, peak):
+    return {
+        "stage": stage,
+        "num_simulations": num_simulations,
+        "years": years,
+        "seconds": elapsed,
+        "peak_mb": peak / 1024**2,
+        "paths_per_second": num_simulations / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def benchmark_pipeline(num_simulations, years, max_in_memory_simulations, backend="numpy", seed=0):
+    """
+    Runs the dashboard pipeline once, with the same functions as the app: above max_in_memory_simulations in
+    streaming mode, otherwise from the growth factors. The in-memory runs also time run_monte_carlo_simulation
+    on its own. backend applies to the engine stages; the growth factors are NumPy only.
+    """
+    params = dict(PARAMETERS, years=years, num_simulations=num_simulations, seed=seed, backend=backend)
+    x_axis_years = np.arange(years + 1)
+    discount_factors = inflation_discount_factors(years, INFLATION_RATE)
+
+    if num_simulations > max_in_memory_simulations:
+        summary, elapsed, peak = measure(run_streaming_simulation, **params)
+        results = [record("simulation_streaming", num_simulations, years, elapsed, peak)]
+
+        year_percentiles, elapsed, peak = measure(lambda: summary["year_percentiles"] / discount_factors[::12])
+        results.append(record("inflation_adjustment", num_simulations, years, elapsed, peak))
+        final_values = summary["final_values"] / discount_factors[-1]
+    else:
+        _, elapsed, peak = measure(run_monte_carlo_simulation, **params)
+        results = [record("simulation", num_simulations, years, elapsed, peak)]
+
+        # A fresh cache, and a SeedSequence instead of an integer seed so the cached shock matrices are not
+        # used either: the growth factors are simulated rather than looked up
+        growth_factors, elapsed, peak = measure(
+            cached_growth_factors, SimulationCache(), years, PARAMETERS["expected_return"], PARAMETERS["volatility"],
+            num_simulations, PARAMETERS["annual_fee"], np.random.SeedSequence(seed)
+        )
+        results.append(record("growth_factors", num_simulations, years, elapsed, peak))
+
+        yearly_values, elapsed, peak = measure(
+            superpose_yearly_values, growth_factors, PARAMETERS["initial_capital"],
+            PARAMETERS["monthly_contribution"], PARAMETERS["contribution_increase_rate"]
+        )
+        results.append(record("superposition", num_simulations, years, elapsed, peak))
+
+        # Like the dashboard, only the yearly rows that are displayed are discounted, not the full path matrix
+        yearly_values, elapsed, peak = measure(lambda: yearly_values / discount_factors[::12, np.newaxis])
+        results.append(record("inflation_adjustment", num_simulations, years, elapsed, peak))
+        final_values = yearly_values[-1]
+
+        year_percentiles, elapsed, peak = measure(percentile_bands, yearly_values, DEFAULT_PERCENTILES)
+        results.append(record("percentile_bands", num_simulations, years, elapsed, peak))
+
+    _, elapsed, peak = measure(final_value_statistics, final_values)
+    results.append(record("final_statistics", num_simulations, years, elapsed, peak))
+
+    _, elapsed, peak = measure(lambda: build_fan_chart(x_axis_years, DEFAULT_PERCENTILES, year_percentiles).to_json())
+    results.append(record("figure", num_simulations, years, elapsed, peak))
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline_path, current_path):
+    """
+    Prints the time ratio (current / baseline) for every stage present in both result files.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+
+    baseline_times = {(r["stage"], r["num_simulations"], r["years"]): r["seconds"] for r in baseline["results"]}
+    print(f"{'stage':<22}{'simulations':>12}{'years':>7}{'baseline s':>12}{'current s':>12}{'ratio':>8}")
+    for r in current["results"]:
+        key = (r["stage"], r["num_simulations"], r["years"])
+        if key in baseline_times:
+            ratio = r["seconds"] / baseline_times[key]
+            print(f"{r['stage']:<22}{r['num_simulations']:>12}{r['years']:>7}"
+                  f"{baseline_times[key]:>12.4f}{r['seconds']:>12.4f}{ratio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simulations", type=int, nargs="+", default=DEFAULT_SIMULATIONS)
+    parser.add_argument("--years", type=int, nargs="+", default=DEFAULT_YEARS)
+    parser.add_argument("--max-in-memory-simulations", type=int, default=MAX_IN_MEMORY_SIMULATIONS,
+                        help="Use streaming mode above this many simulations, like the dashboard")
+    parser.add_argument("--backend", choices=BACKENDS, default="numpy", help="Engine backend to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Report the fastest of this many runs")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Compare two result files instead of running the benchmarks")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    # Warm up imports and caches so the first grid point is not penalized
+    benchmark_pipeline(100, 1, args.max_in_memory_simulations, args.backend)
+
+    results = []
+    for years in args.years:
+        for num_simulations in args.simulations:
+            runs = [benchmark_pipeline(num_simulations, years, args.max_in_memory_simulations, args.backend)
+                    for _ in range(args.repeat)]
+            for stage_runs in zip(*runs):
+                r = min(stage_runs, key=lambda run: run["seconds"])
+                print(f"{r['stage']:<22}{r['num_simulations']:>10} paths {r['years']:>3} years "
+                      f"{r['seconds']:>10.4f} s {r['peak_mb']:>10.1f} MB {r['paths_per_second']:>14,.0f} paths/s")
+                results.append(r)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "cpu_count": os.cpu_count(),
+                "backend": args.backend,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from .adaptive import iter_adaptive_simulation, relative_precision, run_adaptive_simulation
+from .backends import BACKENDS, NUMBA_AVAILABLE
+from .cache import (
+    SimulationCache,
+    cached_growth_factors,
+    cached_monte_carlo_simulation,
+    iter_cached_adaptive_simulation,
+    iter_cached_streaming_simulation,
+)
+from .engine import (
+    calculate_invested_capital,
+    contribution_schedule,
+    goal_thresholds,
+    inflation_discount_factors,
+    run_monte_carlo_simulation,
+)
+from .parallel import run_parallel_monte_carlo_simulation
+from .preview import approximate_final_value_quantiles, preview_statistics
+from .qmc import ORDERINGS, SCIPY_AVAILABLE, sobol_normal_shocks
+from .rng import antithetic_pairs, make_rng, shock_cache_stats, spawn_seed_sequences, standard_normal_shocks
+from .solver import required_monthly_contribution, solve_required_contribution
+from .stats import (
+    QuantileSketch,
+    partition_quantiles,
+    quantile_confidence_intervals,
+    quantile_standard_errors,
+    quantiles_with_confidence_intervals,
+)
+from .streaming import iter_streaming_simulation, run_streaming_simulation
+from .summary import final_value_statistics, success_probability, summarize_scenario, summary_row
+from .superposition import (
+    compute_growth_factors,
+    extend_growth_factors,
+    superpose_final_values,
+    superpose_yearly_values,
+)
+from .sweep import parameter_grid, run_scenario_sweep, run_sweep_final_values
+from .variance_reduction import expected_final_value, variance_reduced_statistics
@@ -0,0 +1,66 @@
+import numpy as np
+
+from .stats import quantiles_with_confidence_intervals
+from .streaming import DEFAULT_PERCENTILES, iter_streaming_simulation
+
+DEFAULT_TARGET_QUANTILES = (0.1, 0.5)
+DEFAULT_BATCH_SIZE = 5000
+# Batch size with quasi_random, a power of two like QMC_CHUNK_SIZE
+QMC_BATCH_SIZE = 4096
+DEFAULT_MAX_SIMULATIONS = 1_000_000
+
+
+def relative_precision(final_values, quantiles=DEFAULT_TARGET_QUANTILES, confidence=0.95):
+    """
+    Returns, for each quantile, the half-width of its confidence interval relative to the estimate,
+    e.g. 0.01 means the quantile is known to within ±1% at the given confidence.
+    """
+    estimates, lower, upper = quantiles_with_confidence_intervals(final_values, quantiles, confidence)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(estimates > 0, (upper - lower) / 2 / np.abs(estimates), np.inf)
+
+
+def iter_adaptive_simulation(initial_capital, monthly_contribution, years, expected_return, volatility,
+                             annual_fee, contribution_increase_rate, seed=None, target_precision=0.01,
+                             quantiles=DEFAULT_TARGET_QUANTILES, confidence=0.95, batch_size=None,
+                             max_simulations=DEFAULT_MAX_SIMULATIONS, percentiles=DEFAULT_PERCENTILES,
+                             num_workers=1, goal=None, antithetic=False, quasi_random=False):
+    """
+    Adds batches of batch_size paths until the confidence intervals of all quantiles of the final value are within
+    ±target_precision (relative) or max_simulations is reached, yielding the streaming summary after every batch.
+
+    Each summary also holds "precision" (see relative_precision) and "converged". The batches are the chunks
+    of a streaming run over max_simulations, so the result is reproducible for a given seed.
+    goal adds "success_probability" to the summaries, antithetic pairs the paths and quasi_random draws every
+    batch from a scrambled Sobol sequence, as in iter_streaming_simulation. The confidence intervals assume
+    independent paths, so with antithetic pairs or Sobol batches they are conservative. batch_size defaults to
+    DEFAULT_BATCH_SIZE, or to QMC_BATCH_SIZE with quasi_random.
+    """
+    if batch_size is None:
+        batch_size = QMC_BATCH_SIZE if quasi_random else DEFAULT_BATCH_SIZE
+    summaries = iter_streaming_simulation(
+        initial_capital, monthly_contribution, years, expected_return, volatility, max_simulations, annual_fee,
+        contribution_increase_rate, seed, percentiles=percentiles, num_workers=num_workers, chunk_size=batch_size,
+        goal=goal, antithetic=antithetic, quasi_random=quasi_random
+    )
+    try:
+        for summary in summaries:
+            precision = relative_precision(summary["final_values"], quantiles, confidence)
+            converged = bool(np.all(precision <= target_precision))
+            if converged:
+                # Do not keep the buffer sized for max_simulations alive
+                summary["final_values"] = summary["final_values"].copy()
+            yield dict(summary, precision=precision, converged=converged)
+            if converged:
+                return
+    finally:
+        summaries.close()
+
+
+def run_adaptive_simulation(*args, **kwargs):
+    """
+    Runs iter_adaptive_simulation to completion and returns its last summary.
+    """
+    for summary in iter_adaptive_simulation(*args, **kwargs):
+        pass
+    return summary
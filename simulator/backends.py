@@ -0,0 +1,59 @@
+import warnings
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+BACKENDS = ("numpy", "numba", "auto")
+
+
+def advance_year_numpy(capital, random_returns, contributions, annual_fee, out):
+    """
+    Advances all paths by one year in place. capital holds the current value of every path,
+    random_returns and out have shape (12, num_simulations) and contributions has length 12.
+    """
+    for month in range(12):
+        capital *= 1 + random_returns[month]
+        capital += contributions[month]
+        if month == 11:
+            capital *= (1 - annual_fee)
+        out[month] = capital
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(parallel=True, cache=True)
+    def advance_year_numba(capital, random_returns, contributions, annual_fee, out):
+        """
+        Same as advance_year_numpy, compiled as a month-by-month loop with the paths split across threads.
+        """
+        num_simulations = capital.shape[0]
+        for i in numba.prange(num_simulations):
+            value = capital[i]
+            for month in range(12):
+                value *= 1 + random_returns[month, i]
+                value += contributions[month]
+                if month == 11:
+                    value *= (1 - annual_fee)
+                out[month, i] = value
+            capital[i] = value
+else:
+    advance_year_numba = None
+
+
+def get_year_kernel(backend="numpy"):
+    """
+    Returns the function that advances all paths by one year for the given backend.
+    "auto" uses numba when it is installed. If "numba" is requested but not installed,
+    the NumPy kernel is used instead.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "numpy":
+        return advance_year_numpy
+    if not NUMBA_AVAILABLE:
+        if backend == "numba":
+            warnings.warn("numba is not installed, falling back to the NumPy backend", RuntimeWarning)
+        return advance_year_numpy
+    return advance_year_numba
@@ -0,0 +1,189 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .adaptive import iter_adaptive_simulation
+from .engine import run_monte_carlo_simulation
+from .qmc import sobol_normal_shocks
+from .rng import antithetic_pairs, standard_normal_shocks
+from .streaming import iter_streaming_simulation, run_streaming_simulation
+from .superposition import compute_growth_factors, extend_growth_factors
+
+
+def _result_arrays(result):
+    # A result is either a path matrix or a streaming summary dict
+    if isinstance(result, dict):
+        return [value for value in result.values() if isinstance(value, np.ndarray)]
+    return [result]
+
+
+class SimulationCache:
+    """
+    LRU cache for simulation results, keyed on the full parameter tuple.
+    Entries are evicted (least recently used first) once the stored arrays exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes=512 * 1024**2):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return None
+
+    def put(self, key, result):
+        arrays = _result_arrays(result)
+        # Cached arrays are shared between reruns and sessions, so they must not be modified in place
+        for array in arrays:
+            array.setflags(write=False)
+        nbytes = sum(array.nbytes for array in arrays)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (result, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_nbytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "size_mb": self.current_bytes / 1024**2,
+            }
+
+
+def cached_monte_carlo_simulation(cache, initial_capital, monthly_contribution, years,
+                                  expected_return, volatility, num_simulations, annual_fee, contribution_increase_rate,
+                                  seed, streaming=False):
+    """
+    Returns the simulation result from the cache, running the simulation only on a cache miss.
+    With streaming=True the result is the summary dict of run_streaming_simulation instead of the path matrix.
+    In-memory runs with an integer seed reuse the cached shock matrix, so a miss after changing
+    anything but the seed, horizon or number of simulations skips the random number generation.
+    """
+    params = (initial_capital, monthly_contribution, years, expected_return, volatility,
+              num_simulations, annual_fee, contribution_increase_rate, seed)
+    key = params + (streaming,)
+    result = cache.get(key)
+    if result is None:
+        if streaming:
+            result = run_streaming_simulation(*params)
+        elif isinstance(seed, (int, np.integer)):
+            shocks = standard_normal_shocks(int(seed), years * 12, num_simulations)
+            result = run_monte_carlo_simulation(*params, shocks=shocks)
+        else:
+            result = run_monte_carlo_simulation(*params)
+        cache.put(key, result)
+    return result
+
+
+def _options_key(goal, antithetic, quasi_random):
+    # Per-month goals are arrays, which are not hashable. Without options the key stays empty, so the plain
+    # streaming result is shared with cached_monte_carlo_simulation(..., streaming=True)
+    if goal is None and not antithetic and not quasi_random:
+        return ()
+    return (None if goal is None else tuple(np.atleast_1d(goal).tolist()), antithetic, quasi_random)
+
+
+def _iter_cached(cache, key, make_summaries):
+    # Yields the cached summary once on a hit, otherwise the interim summaries, caching the last one
+    result = cache.get(key)
+    if result is not None:
+        yield result
+        return
+
+    for result in make_summaries():
+        yield result
+    cache.put(key, result)
+
+
+def iter_cached_streaming_simulation(cache, initial_capital, monthly_contribution, years, expected_return,
+                                     volatility, num_simulations, annual_fee, contribution_increase_rate, seed,
+                                     goal=None, antithetic=False, quasi_random=False):
+    """
+    Progressive form of cached_monte_carlo_simulation(..., streaming=True): yields the cached summary once on a hit,
+    otherwise the interim summaries of iter_streaming_simulation, caching the last one if the run completes.
+    """
+    params = (initial_capital, monthly_contribution, years, expected_return, volatility,
+              num_simulations, annual_fee, contribution_increase_rate, seed)
+    key = params + (True,) + _options_key(goal, antithetic, quasi_random)
+    yield from _iter_cached(cache, key, lambda: iter_streaming_simulation(*params, goal=goal, antithetic=antithetic,
+                                                                          quasi_random=quasi_random))
+
+
+def iter_cached_adaptive_simulation(cache, initial_capital, monthly_contribution, years, expected_return,
+                                    volatility, annual_fee, contribution_increase_rate, seed, target_precision,
+                                    goal=None, antithetic=False, quasi_random=False):
+    """
+    Cached form of iter_adaptive_simulation, with the same semantics as iter_cached_streaming_simulation.
+    """
+    params = (initial_capital, monthly_contribution, years, expected_return, volatility,
+              annual_fee, contribution_increase_rate, seed)
+    key = ("adaptive",) + params + (target_precision,) + _options_key(goal, antithetic, quasi_random)
+    yield from _iter_cached(cache, key, lambda: iter_adaptive_simulation(*params, target_precision=target_precision,
+                                                                         goal=goal, antithetic=antithetic,
+                                                                         quasi_random=quasi_random))
+
+
+def cached_growth_factors(cache, years, expected_return, volatility, num_simulations, annual_fee, seed,
+                          antithetic=False, quasi_random=False, cache_shocks=True):
+    """
+    Returns the growth factors of compute_growth_factors from the cache. They do not depend on the initial capital
+    or the contributions, so changing those only needs superpose_yearly_values on the cached factors.
+
+    One entry is kept per parameter set regardless of the horizon, holding the longest horizon computed so far:
+    shorter horizons are sliced from it and longer ones only simulate the additional years.
+    Quasi-random shocks (see sobol_normal_shocks) depend on the whole horizon, so they are cached per horizon.
+
+    An integer seed takes its shocks from the standard_normal_shocks cache, which holds a (months, num_simulations)
+    matrix. With cache_shocks=False they are drawn year by year from the seed instead: the same draws, but only
+    the growth factors are kept, for path counts whose shock matrix would be too large to hold.
+    """
+    key = ("growth_factors", expected_return, volatility, num_simulations, annual_fee, seed, antithetic)
+    if quasi_random:
+        key += ("quasi_random", years)
+        growth_factors = cache.get(key)
+        if growth_factors is None:
+            shocks = sobol_normal_shocks(seed, years * 12, num_simulations, antithetic=antithetic)
+            growth_factors = compute_growth_factors(years, expected_return, volatility, num_simulations,
+                                                    annual_fee, shocks=shocks)
+            cache.put(key, growth_factors)
+        return growth_factors
+
+    growth_factors = cache.get(key)
+    if growth_factors is not None and len(growth_factors["contribution_factors"]) >= years:
+        return extend_growth_factors(growth_factors, years, expected_return, volatility, annual_fee)
+
+    # Shocks are only needed (and, with antithetic=True, built) when something has to be simulated
+    shocks = None
+    if cache_shocks and isinstance(seed, (int, np.integer)):
+        if antithetic:
+            half = -(-num_simulations // 2)
+            shocks = antithetic_pairs(standard_normal_shocks(int(seed), years * 12, half), num_simulations)
+        else:
+            shocks = standard_normal_shocks(int(seed), years * 12, num_simulations)
+
+    if growth_factors is None:
+        growth_factors = compute_growth_factors(years, expected_return, volatility, num_simulations, annual_fee,
+                                                seed, shocks=shocks, antithetic=antithetic)
+    else:
+        growth_factors = extend_growth_factors(growth_factors, years, expected_return, volatility, annual_fee,
+                                               shocks=shocks, antithetic=antithetic)
+    cache.put(key, growth_factors)
+    return extend_growth_factors(growth_factors, years, expected_return, volatility, annual_fee)
@@ -0,0 +1,111 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from .stats import partition_quantiles
+
+BAND_COLOR = "rgba(70, 130, 180, {opacity})"
+
+
+def pack_paths(x_axis_years, yearly_paths):
+    """
+    Concatenates all paths (columns of yearly_paths) into one x/y pair, separated by NaN,
+    so they can be drawn as a single trace.
+    """
+    num_points, num_paths = yearly_paths.shape
+    x = np.empty((num_paths, num_points + 1))
+    x[:, :-1] = x_axis_years
+    x[:, -1] = np.nan
+    y = np.empty((num_paths, num_points + 1))
+    y[:, :-1] = yearly_paths.T
+    y[:, -1] = np.nan
+    return x.ravel(), y.ravel()
+
+
+def paths_trace(x_axis_years, yearly_paths):
+    """
+    Returns one WebGL trace showing every path, instead of one trace per path.
+    """
+    x, y = pack_paths(x_axis_years, yearly_paths)
+    return go.Scattergl(
+        x=x,
+        y=y,
+        mode='lines',
+        line=dict(width=0.5, color='lightblue'),
+        connectgaps=False,
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+def histogram_trace(values, num_bins=100):
+    """
+    Bins values on the server and returns them as bars, so the figure carries num_bins counts
+    instead of every raw value.
+    """
+    counts, edges = np.histogram(values, bins=num_bins)
+    return go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=counts,
+        width=np.diff(edges),
+        name="Frequency"
+    )
+
+
+def percentile_bands(yearly_values, percentiles):
+    """
+    Computes the given percentiles for every row of yearly_values (shape (years + 1, num_simulations)).
+    Returns an array of shape (len(percentiles), years + 1).
+    """
+    return partition_quantiles(yearly_values, np.asarray(percentiles) / 100, axis=1)
+
+
+def build_fan_chart(x_axis_years, percentiles, band_values, sample_paths=None):
+    """
+    Draws filled bands between symmetric percentiles (e.g. 5/95, 10/90, 25/75) and the median as a line.
+    sample_paths is an optional array of shape (years + 1, n) with a few individual paths to overlay.
+    """
+    fig = go.Figure()
+    bands = dict(zip(percentiles, band_values))
+    lower_percentiles = sorted(p for p in percentiles if p < 50 and 100 - p in bands)
+
+    for i, lower in enumerate(lower_percentiles):
+        upper = 100 - lower
+        opacity = 0.15 + 0.5 * (i + 1) / (len(lower_percentiles) + 1)
+        fig.add_trace(go.Scatter(
+            x=x_axis_years,
+            y=bands[lower],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=x_axis_years,
+            y=bands[upper],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor=BAND_COLOR.format(opacity=opacity),
+            name=f'{lower}th–{upper}th percentile'
+        ))
+
+    if sample_paths is not None:
+        fig.add_trace(paths_trace(x_axis_years, sample_paths))
+
+    if 50 in bands:
+        fig.add_trace(go.Scatter(
+            x=x_axis_years,
+            y=bands[50],
+            mode='lines',
+            line=dict(width=2, color=BAND_COLOR.format(opacity=1)),
+            name='Median'
+        ))
+
+    return fig
+
+
+def build_paths_chart(x_axis_years, yearly_paths):
+    """
+    Draws every simulated path, packed into a single WebGL trace.
+    """
+    return go.Figure(data=[paths_trace(x_axis_years, yearly_paths)])
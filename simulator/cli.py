@@ -0,0 +1,158 @@
+"""
+Runs simulations without the dashboard and writes one summary row per parameter set.
+
+Single scenario from the command line (rates as fractions, e.g. 0.07 for 7%):
+
+    python -m simulator --years 30 --expected-return 0.07 --num-simulations 100000 --output summary.csv
+
+Many scenarios from a CSV or JSON file whose columns/keys are the parameter names:
+
+    python -m simulator --params-file scenarios.csv --workers 32 --output summary.parquet
+
+With --common-random-numbers all parameter sets are evaluated together on one shared set of random shocks,
+which is faster and makes the differences between scenarios less noisy. All sets then use the same
+--num-simulations and --seed.
+
+With --goal every row also gets the monthly contribution needed to end with at least that amount (in today's
+money) with probability --goal-probability:
+
+    python -m simulator --goal 500000 --goal-probability 0.9
+"""
+import argparse
+import json
+import os
+import sys
+
+import pandas as pd
+
+from .backends import BACKENDS
+from .engine import inflation_discount_factors
+from .solver import solve_required_contribution
+from .summary import summarize_scenario
+from .sweep import run_scenario_sweep
+
+PARAMETER_DEFAULTS = {
+    "initial_capital": 10000.0,
+    "monthly_contribution": 500.0,
+    "years": 30,
+    "expected_return": 0.07,
+    "volatility": 0.15,
+    "num_simulations": 10000,
+    "annual_fee": 0.002,
+    "contribution_increase_rate": 0.0,
+    "seed": 42,
+    "inflation_rate": 0.02,
+}
+INTEGER_PARAMETERS = ("years", "num_simulations", "seed")
+
+
+def load_parameter_sets(path):
+    """
+    Reads parameter sets from a .csv file (one row per set) or a .json file (a list of objects).
+    Missing parameters take the command-line values.
+    """
+    if path.endswith(".json"):
+        with open(path) as f:
+            parameter_sets = json.load(f)
+    elif path.endswith(".csv"):
+        # Blank cells are read as NaN; drop them so those parameters take the command-line values
+        parameter_sets = [
+            {name: value for name, value in record.items() if pd.notna(value)}
+            for record in pd.read_csv(path).to_dict(orient="records")
+        ]
+    else:
+        raise ValueError(f"Unsupported parameter file {path!r}, expected .csv or .json")
+
+    for parameter_set in parameter_sets:
+        unknown = set(parameter_set) - set(PARAMETER_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown parameters in {path!r}: {', '.join(sorted(unknown))}")
+    return parameter_sets
+
+
+def write_summaries(rows, path):
+    """
+    Writes the summary rows to .csv, .parquet or .json depending on the file extension; "-" prints CSV.
+    """
+    summaries = pd.DataFrame(rows)
+    if path == "-":
+        summaries.to_csv(sys.stdout, index=False)
+    elif path.endswith(".csv"):
+        summaries.to_csv(path, index=False)
+    elif path.endswith(".parquet"):
+        summaries.to_parquet(path, index=False)
+    elif path.endswith(".json"):
+        summaries.to_json(path, orient="records", indent=2)
+    else:
+        raise ValueError(f"Unsupported output file {path!r}, expected .csv, .parquet or .json")
+
+
+def add_required_contributions(rows, parameter_sets, goal, probability):
+    """
+    Adds "required_monthly_contribution" to every summary row (see solve_required_contribution).
+    """
+    for row, params in zip(rows, parameter_sets):
+        years = int(params["years"])
+        nominal_goal = goal * inflation_discount_factors(years, params["inflation_rate"])[-1]
+        row["required_monthly_contribution"] = solve_required_contribution(
+            params["initial_capital"], nominal_goal, probability, years, params["expected_return"],
+            params["volatility"], int(params["num_simulations"]), params["annual_fee"],
+            params["contribution_increase_rate"], int(params["seed"])
+        )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m simulator", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    for name, default in PARAMETER_DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", dest=name, default=default,
+                            type=int if name in INTEGER_PARAMETERS else float)
+    parser.add_argument("--params-file", help="CSV or JSON file with one parameter set per row/object")
+    parser.add_argument("--output", default="-", help="Output file (.csv, .parquet or .json); default: CSV to stdout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes per scenario")
+    parser.add_argument("--backend", choices=BACKENDS, default="numpy")
+    parser.add_argument("--common-random-numbers", action="store_true",
+                        help="Evaluate all parameter sets together on shared random shocks")
+    parser.add_argument("--goal", type=float,
+                        help="Also solve for the monthly contribution needed to reach this final value (today's money)")
+    parser.add_argument("--goal-probability", type=float, default=0.9,
+                        help="Probability with which --goal must be reached (default: 0.9)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    defaults = {name: getattr(args, name) for name in PARAMETER_DEFAULTS}
+
+    parameter_sets = load_parameter_sets(args.params_file) if args.params_file else [{}]
+
+    if args.common_random_numbers:
+        shared = [name for name in ("num_simulations", "seed") if any(name in p for p in parameter_sets)]
+        if shared:
+            raise SystemExit(f"--common-random-numbers uses one {' and '.join(shared)} for all parameter sets; "
+                             f"remove {', '.join(shared)} from the parameter file")
+        parameter_sets = [dict(defaults, **parameter_set) for parameter_set in parameter_sets]
+        print(f"Sweeping {len(parameter_sets)} scenarios with common random numbers", file=sys.stderr)
+        rows = run_scenario_sweep(parameter_sets, args.num_simulations, args.seed)
+        if args.goal is not None:
+            add_required_contributions(rows, parameter_sets, args.goal, args.goal_probability)
+        write_summaries(rows, args.output)
+        return
+
+    rows = []
+    scenarios = []
+    for i, parameter_set in enumerate(parameter_sets, start=1):
+        params = dict(defaults, **parameter_set)
+        for name in INTEGER_PARAMETERS:
+            params[name] = int(params[name])
+        print(f"Scenario {i}/{len(parameter_sets)}: {params}", file=sys.stderr)
+        rows.append(summarize_scenario(**params, num_workers=args.workers, backend=args.backend))
+        scenarios.append(params)
+
+    if args.goal is not None:
+        add_required_contributions(rows, scenarios, args.goal, args.goal_probability)
+    write_summaries(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import numpy as np
+
+from .backends import get_year_kernel
+from .qmc import sobol_normal_shocks
+from .rng import draw_year_returns, make_rng
+
+
+def contribution_schedule(monthly_contribution, years, contribution_increase_rate):
+    """
+    Returns the contribution paid in each month of the investment horizon.
+    The contribution is raised after every full year, so month m pays the rate of year m // 12.
+    """
+    num_months = years * 12
+    return monthly_contribution * (1 + contribution_increase_rate) ** (np.arange(num_months) // 12)
+
+
+def calculate_invested_capital(initial_capital, monthly_contribution, years, contribution_increase_rate):
+    """
+    Computes the deterministic path of total invested capital (initial capital plus all contributions so far).
+    """
+    contributions = contribution_schedule(monthly_contribution, years, contribution_increase_rate)
+
+    invested_capital_path = np.empty(len(contributions) + 1)
+    invested_capital_path[0] = initial_capital
+    invested_capital_path[1:] = initial_capital + np.cumsum(contributions)
+
+    return invested_capital_path
+
+
+def inflation_discount_factors(years, inflation_rate):
+    """
+    Returns the factor for every month (0 to years * 12) by which nominal values are divided to get today's money.
+    """
+    months = np.arange(years * 12 + 1)
+    return (1 + inflation_rate / 12) ** months
+
+
+def goal_thresholds(goal, years, inflation_rate=0.0):
+    """
+    Returns the nominal value needed in every month (0 to years * 12) to reach goal, an amount in today's money.
+    """
+    return goal * inflation_discount_factors(years, inflation_rate)
+
+
+def run_monte_carlo_simulation(initial_capital, monthly_contribution, years, 
+                               expected_return, volatility, num_simulations, annual_fee, contribution_increase_rate,
+                               seed=None, dtype=np.float64, backend="numpy", shocks=None, antithetic=False,
+                               quasi_random=False, goal=None, success_counts=None):
+    """
+    Performs a Monte Carlo simulation for an investment portfolio.
+    The same seed always produces the same paths; see make_rng for the accepted seed types.
+
+    The returns are drawn one year (12 months x num_simulations) at a time. backend selects how the paths
+    are advanced through each year: "numpy" updates all paths with one array operation per month,
+    "numba" runs a compiled loop over the paths in parallel and "auto" uses numba when it is installed.
+    Both backends give the same result.
+
+    shocks optionally supplies precomputed standard-normal draws of shape (num_months, num_simulations),
+    e.g. from standard_normal_shocks. The returns are then only rescaled from them and seed is ignored.
+    With antithetic=True only half the shocks are drawn and the other half of the paths uses their negatives
+    (see antithetic_pairs), which lowers the variance of the estimated statistics.
+    With quasi_random=True the shocks come from a scrambled Sobol sequence (see sobol_normal_shocks)
+    instead of the pseudo-random generator, so the percentiles converge faster in the number of paths.
+
+    goal is an optional target value, either one amount or one per month (length num_months + 1, e.g. from
+    goal_thresholds). The number of paths at or above it in each month is then added to success_counts
+    (an integer array of length num_months + 1) while the paths are advanced, so no second pass over the
+    path matrix is needed; summing the counts of several runs gives the counts of all their paths.
+
+    dtype sets the precision of the returned path matrix. The capital is always accumulated in float64,
+    so with dtype=np.float32 each stored value is the float64 result rounded to float32: the relative error
+    is at most 2**-24 (about 6e-8, i.e. below 1 cent up to €160,000) and does not grow with the horizon.
+    """
+    monthly_return = expected_return / 12
+    monthly_volatility = volatility / np.sqrt(12)
+    num_months = years * 12
+
+    if quasi_random and shocks is None:
+        shocks = sobol_normal_shocks(seed, num_months, num_simulations, antithetic=antithetic)
+    rng = make_rng(seed)
+    contributions = contribution_schedule(monthly_contribution, years, contribution_increase_rate)
+
+    all_simulation_paths = np.empty((num_months + 1, num_simulations), dtype=dtype)
+    all_simulation_paths[0] = initial_capital
+
+    if goal is not None:
+        if success_counts is None:
+            raise ValueError("goal needs a success_counts array of length years * 12 + 1 to count into")
+        goal = np.broadcast_to(np.asarray(goal, dtype=np.float64), (num_months + 1,))
+        success_counts[0] += num_simulations if initial_capital >= goal[0] else 0
+
+    advance_year = get_year_kernel(backend)
+    capital = np.full(num_simulations, float(initial_capital))
+    for year_start in range(0, num_months, 12):
+        random_returns = draw_year_returns(rng, shocks, year_start // 12, monthly_return, monthly_volatility,
+                                           num_simulations, antithetic)
+        year_paths = all_simulation_paths[year_start + 1:year_start + 13]
+        advance_year(capital, random_returns, contributions[year_start:year_start + 12], annual_fee, year_paths)
+        if goal is not None:
+            # Counted while the year is still in cache
+            success_counts[year_start + 1:year_start + 13] += np.count_nonzero(
+                year_paths >= goal[year_start + 1:year_start + 13, np.newaxis], axis=1
+            )
+
+    return all_simulation_paths
@@ -0,0 +1,72 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .engine import run_monte_carlo_simulation
+from .rng import spawn_seed_sequences
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def split_into_chunks(num_simulations, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Splits num_simulations into chunk sizes of at most chunk_size paths.
+    """
+    num_chunks = -(-num_simulations // chunk_size)
+    return [min(chunk_size, num_simulations - i * chunk_size) for i in range(num_chunks)]
+
+
+def process_pool(num_workers):
+    """
+    Creates a ProcessPoolExecutor whose workers start from a fork server (or are spawned where there is none)
+    instead of being forked: forking a process in which the parallel numba backend has run hangs the pool.
+    """
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context(start_method))
+
+
+def _simulate_chunk(args):
+    return run_monte_carlo_simulation(*args)
+
+
+def _merge_chunks(chunks, num_rows, num_simulations, dtype):
+    all_simulation_paths = np.empty((num_rows, num_simulations), dtype=dtype)
+    start = 0
+    for chunk in chunks:
+        all_simulation_paths[:, start:start + chunk.shape[1]] = chunk
+        start += chunk.shape[1]
+    return all_simulation_paths
+
+
+def run_parallel_monte_carlo_simulation(initial_capital, monthly_contribution, years,
+                                        expected_return, volatility, num_simulations, annual_fee,
+                                        contribution_increase_rate, seed=None, num_workers=None,
+                                        chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64,
+                                        backend="numpy"):
+    """
+    Runs run_monte_carlo_simulation in a process pool and merges the chunks into one path matrix.
+
+    The paths are split into chunks of chunk_size, each with its own independent RNG substream.
+    The chunking does not depend on num_workers, so a given seed gives the same result for any worker count.
+    num_workers defaults to the number of CPU cores. dtype and backend are passed on to run_monte_carlo_simulation.
+    """
+    chunk_sizes = split_into_chunks(num_simulations, chunk_size)
+    chunk_seeds = spawn_seed_sequences(seed, len(chunk_sizes))
+    chunk_args = [
+        (initial_capital, monthly_contribution, years, expected_return, volatility,
+         size, annual_fee, contribution_increase_rate, chunk_seed, dtype, backend)
+        for size, chunk_seed in zip(chunk_sizes, chunk_seeds)
+    ]
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(chunk_args))
+
+    num_rows = years * 12 + 1
+    if num_workers <= 1:
+        return _merge_chunks(map(_simulate_chunk, chunk_args), num_rows, num_simulations, dtype)
+
+    with process_pool(num_workers) as executor:
+        return _merge_chunks(executor.map(_simulate_chunk, chunk_args), num_rows, num_simulations, dtype)
@@ -0,0 +1,88 @@
+import warnings
+
+import numpy as np
+
+from .rng import antithetic_pairs, make_rng
+
+try:
+    from scipy.special import ndtri
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+
+SCIPY_AVAILABLE = qmc is not None
+ORDERINGS = ("bridge", "pca", "none")
+
+
+def brownian_bridge(z):
+    """
+    Builds Brownian paths W(1), ..., W(num_months) from standard normals z of shape (num_months, n).
+    z[0] sets the end point, z[1] the midpoint, then the quarter points and so on, so the first rows,
+    which carry the best-distributed Sobol coordinates, determine the large-scale shape of the paths.
+    """
+    num_months = len(z)
+    paths = np.zeros((num_months + 1, z.shape[1]))
+    paths[num_months] = np.sqrt(num_months) * z[0]
+    intervals = [(0, num_months)]
+    row = 1
+    while intervals:
+        left, right = intervals.pop(0)
+        if right - left < 2:
+            continue
+        middle = (left + right) // 2
+        weight = (middle - left) / (right - left)
+        paths[middle] = (1 - weight) * paths[left] + weight * paths[right]
+        paths[middle] += np.sqrt((middle - left) * (right - middle) / (right - left)) * z[row]
+        row += 1
+        intervals += [(left, middle), (middle, right)]
+    return paths[1:]
+
+
+def pca_increment_matrix(num_months):
+    """
+    Returns the matrix mapping standard normals to monthly Brownian increments along the principal components
+    of the Brownian path, largest variance first.
+    """
+    months = np.arange(1, num_months + 1)
+    eigenvalues, eigenvectors = np.linalg.eigh(np.minimum.outer(months, months).astype(np.float64))
+    path_matrix = eigenvectors[:, ::-1] * np.sqrt(np.clip(eigenvalues[::-1], 0, None))
+    return np.diff(path_matrix, axis=0, prepend=0)
+
+
+def sobol_normal_shocks(seed, num_months, num_simulations, ordering="bridge", antithetic=False):
+    """
+    Returns a standard-normal shock matrix (num_months, num_simulations) from a scrambled Sobol sequence,
+    for use as shocks in run_monte_carlo_simulation. The seed sets the scrambling.
+
+    Each path is one Sobol point with one coordinate per month. ordering selects how the coordinates are
+    turned into monthly shocks: "bridge" (Brownian bridge) and "pca" (principal components) let the first,
+    most uniform coordinates decide the overall path, which is what the final-value percentiles mostly
+    depend on; "none" uses coordinate m for month m. The error of the percentiles then shrinks faster
+    than the 1/sqrt(n) of pseudo-random shocks, most of all for powers of two as num_simulations.
+    With antithetic=True only half the points are drawn and mirrored with antithetic_pairs.
+
+    Requires scipy; without it a RuntimeWarning is issued and pseudo-random shocks are returned instead.
+    """
+    if ordering not in ORDERINGS:
+        raise ValueError(f"Unknown ordering {ordering!r}, expected one of {ORDERINGS}")
+    num_points = -(-num_simulations // 2) if antithetic else num_simulations
+    if not SCIPY_AVAILABLE:
+        warnings.warn("scipy is not installed, falling back to pseudo-random shocks", RuntimeWarning)
+        z = make_rng(seed).standard_normal(size=(num_months, num_points))
+        return antithetic_pairs(z, num_simulations) if antithetic else z
+
+    sampler = qmc.Sobol(d=num_months, scramble=True, seed=make_rng(seed))
+    with warnings.catch_warnings():
+        # Sobol warns if the number of points is not a power of two
+        warnings.simplefilter("ignore", UserWarning)
+        points = sampler.random(num_points)
+    # Scrambled points can be exactly 0, which would map to an infinite shock
+    z = ndtri(np.clip(points, 2.0**-32, 1 - 2.0**-32)).T
+
+    if ordering == "bridge":
+        shocks = np.diff(brownian_bridge(z), axis=0, prepend=0)
+    elif ordering == "pca":
+        shocks = pca_increment_matrix(num_months) @ z
+    else:
+        shocks = z
+    return antithetic_pairs(shocks, num_simulations) if antithetic else shocks
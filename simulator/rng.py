@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def make_rng(seed=None):
+    """
+    Creates a numpy Generator. seed may be None (fresh entropy), an int, a SeedSequence or an existing Generator.
+    """
+    return np.random.default_rng(seed)
+
+
+def spawn_seed_sequences(seed, num_streams):
+    """
+    Derives num_streams independent SeedSequences from one seed, e.g. one per chunk of paths.
+    The streams are statistically independent, so chunks can be simulated in parallel without correlation.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(num_streams)
+
+
+def antithetic_pairs(shocks, num_simulations):
+    """
+    Mirrors shocks of shape (months, ceil(num_simulations / 2)) into num_simulations columns: column i + half
+    holds -shocks[:, i], so the paths come in antithetic pairs (i, i + half).
+    """
+    return np.concatenate([shocks, -shocks], axis=1)[:, :num_simulations]
+
+
+def draw_year_returns(rng, shocks, year, monthly_return, monthly_volatility, num_simulations, antithetic=False):
+    """
+    Returns the monthly returns (12, num_simulations) of the given year, rescaled from shocks if they are given,
+    otherwise drawn from rng. Drawing year by year yields the same stream as one (num_months, num_simulations) draw.
+    """
+    if shocks is not None:
+        return monthly_return + monthly_volatility * shocks[year * 12:(year + 1) * 12]
+    if antithetic:
+        half = -(-num_simulations // 2)
+        return monthly_return + monthly_volatility * antithetic_pairs(rng.standard_normal(size=(12, half)),
+                                                                      num_simulations)
+    return rng.normal(monthly_return, monthly_volatility, size=(12, num_simulations))
+
+
+# Upper bound on the memory of the shock cache, which is kept next to (not inside) the SimulationCache
+# because shocks are shared by every parameter set with the same seed and number of simulations
+MAX_SHOCK_CACHE_BYTES = 256 * 1024**2
+
+# (seed, num_simulations) -> (shock matrix for the longest horizon drawn so far, generator positioned after it)
+_shock_matrices = OrderedDict()
+_shock_lock = threading.Lock()
+_shock_cache_stats = {"hits": 0, "misses": 0}
+
+
+def standard_normal_shocks(seed, num_months, num_simulations):
+    """
+    Returns the standard-normal shock matrix (num_months, num_simulations) for an integer seed, cached so that
+    runs which only change other parameters reuse it. The matrix is read-only. Passed as shocks to
+    run_monte_carlo_simulation it gives exactly the same paths as drawing with the same seed.
+
+    One matrix is kept per (seed, num_simulations): shorter horizons are a prefix of it, and longer horizons
+    only draw the additional months from the stored generator state. Least recently used matrices are evicted
+    once the cache holds more than MAX_SHOCK_CACHE_BYTES, and a matrix larger than that on its own is returned
+    without being cached.
+    """
+    key = (seed, num_simulations)
+    with _shock_lock:
+        if key in _shock_matrices:
+            _shock_matrices.move_to_end(key)
+            shocks, rng = _shock_matrices[key]
+        else:
+            shocks, rng = np.empty((0, num_simulations)), make_rng(seed)
+
+        if len(shocks) < num_months:
+            _shock_cache_stats["misses"] += 1
+            additional_shocks = rng.standard_normal(size=(num_months - len(shocks), num_simulations))
+            shocks = np.concatenate([shocks, additional_shocks])
+            shocks.setflags(write=False)
+        else:
+            _shock_cache_stats["hits"] += 1
+
+        if shocks.nbytes > MAX_SHOCK_CACHE_BYTES:
+            _shock_matrices.pop(key, None)
+            return shocks[:num_months]
+
+        _shock_matrices[key] = (shocks, rng)
+        cached_bytes = sum(matrix.nbytes for matrix, _ in _shock_matrices.values())
+        while cached_bytes > MAX_SHOCK_CACHE_BYTES:
+            evicted_shocks, _ = _shock_matrices.popitem(last=False)[1]
+            cached_bytes -= evicted_shocks.nbytes
+
+    return shocks[:num_months]
+
+
+def shock_cache_stats():
+    """
+    Returns the hits, misses, number of matrices and size in MB of the standard_normal_shocks cache.
+    """
+    with _shock_lock:
+        return dict(_shock_cache_stats, entries=len(_shock_matrices),
+                    size_mb=sum(matrix.nbytes for matrix, _ in _shock_matrices.values()) / 1024**2)
@@ -0,0 +1,136 @@
+from statistics import NormalDist
+
+import numpy as np
+
+
+def _linear_interpolation(lower_values, upper_values, fractions):
+    # Same formula as np.quantile, so the results are identical
+    difference = upper_values - lower_values
+    return np.where(fractions >= 0.5, upper_values - difference * (1 - fractions),
+                    lower_values + difference * fractions)
+
+
+def partition_quantiles(values, quantiles, axis=-1):
+    """
+    Computes all quantiles (between 0 and 1) of values along axis with a single np.partition,
+    instead of one sort or partition per np.percentile call. The result is identical to
+    np.quantile(values, quantiles, axis=axis), with the quantiles along the first axis.
+    """
+    values = np.asarray(values)
+    q = np.asarray(quantiles, dtype=np.float64)
+    n = values.shape[axis]
+    positions = (n - 1) * np.atleast_1d(q)
+    lower_ranks = np.floor(positions).astype(int)
+    upper_ranks = np.minimum(lower_ranks + 1, n - 1)
+    partitioned = np.partition(values, np.unique(np.concatenate([lower_ranks, upper_ranks])), axis=axis)
+
+    lower_values = np.moveaxis(np.take(partitioned, lower_ranks, axis=axis), axis, 0)
+    upper_values = np.moveaxis(np.take(partitioned, upper_ranks, axis=axis), axis, 0)
+    fractions = (positions - lower_ranks).reshape((-1,) + (1,) * (lower_values.ndim - 1))
+    result = _linear_interpolation(lower_values, upper_values, fractions)
+    return result if q.ndim else result[0]
+
+
+def _confidence_interval_ranks(n, q, confidence):
+    # Order statistics at ranks n*q -/+ z*sqrt(n*q*(1-q))
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    half_width = z * np.sqrt(n * q * (1 - q))
+    lower_ranks = np.clip(np.floor(n * q - half_width), 0, n - 1).astype(int)
+    upper_ranks = np.clip(np.ceil(n * q + half_width), 0, n - 1).astype(int)
+    return lower_ranks, upper_ranks
+
+
+def quantile_confidence_intervals(values, quantiles, confidence=0.95):
+    """
+    Distribution-free confidence intervals for the given quantiles (between 0 and 1) of values.
+
+    Uses the order statistics at ranks n*q -/+ z*sqrt(n*q*(1-q)), found with a single np.partition.
+    Returns (lower, upper) arrays of the same length as quantiles.
+    """
+    values = np.asarray(values)
+    lower_ranks, upper_ranks = _confidence_interval_ranks(len(values), np.atleast_1d(quantiles), confidence)
+    partitioned = np.partition(values, np.unique(np.concatenate([lower_ranks, upper_ranks])))
+    return partitioned[lower_ranks], partitioned[upper_ranks]
+
+
+def quantiles_with_confidence_intervals(values, quantiles, confidence=0.95):
+    """
+    Returns (estimates, lower, upper): the quantiles as in partition_quantiles together with their
+    quantile_confidence_intervals, all from the same single np.partition.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    q = np.atleast_1d(quantiles).astype(np.float64)
+    positions = (n - 1) * q
+    estimate_ranks = np.floor(positions).astype(int)
+    next_ranks = np.minimum(estimate_ranks + 1, n - 1)
+    lower_ranks, upper_ranks = _confidence_interval_ranks(n, q, confidence)
+    partitioned = np.partition(values, np.unique(np.concatenate([estimate_ranks, next_ranks,
+                                                                 lower_ranks, upper_ranks])))
+    estimates = _linear_interpolation(partitioned[estimate_ranks], partitioned[next_ranks],
+                                      positions - estimate_ranks)
+    return estimates, partitioned[lower_ranks], partitioned[upper_ranks]
+
+
+def quantile_standard_errors(values, quantiles, confidence=0.95):
+    """
+    Monte Carlo standard errors of the given quantiles, derived from their confidence intervals.
+    """
+    lower, upper = quantile_confidence_intervals(values, quantiles, confidence)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    return (upper - lower) / (2 * z)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile estimator for several rows of values (e.g. one row per year).
+
+    Values are counted in logarithmically spaced bins, so every quantile is returned with a
+    relative error of at most relative_accuracy and memory does not grow with the number of values.
+    Values below min_value are counted as 0, values above max_value in the top bin.
+    Sketches of separate chunks (or processes) merge exactly: the merged sketch is the same as one
+    sketch of all values, so the error bound holds for any number of chunks.
+    """
+
+    def __init__(self, num_rows=1, relative_accuracy=0.005, min_value=1.0, max_value=1e15):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+        self.offset = int(np.ceil(np.log(min_value) / self.log_gamma))
+        # Bin 0 holds everything below min_value
+        self.num_bins = int(np.ceil(np.log(max_value) / self.log_gamma)) - self.offset + 2
+        self.counts = np.zeros((num_rows, self.num_bins), dtype=np.int64)
+
+    def add(self, values):
+        """
+        Adds values of shape (num_rows, n).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        num_rows = self.counts.shape[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bins = np.ceil(np.log(values) / self.log_gamma) - self.offset + 1
+        bins = np.where(values < self.min_value, 0, np.clip(bins, 1, self.num_bins - 1)).astype(np.int64)
+        bins += np.arange(num_rows)[:, np.newaxis] * self.num_bins
+        self.counts += np.bincount(bins.ravel(), minlength=num_rows * self.num_bins).reshape(num_rows, self.num_bins)
+
+    def merge(self, other):
+        if other.counts.shape != self.counts.shape or other.gamma != self.gamma or other.offset != self.offset:
+            raise ValueError("Only sketches with the same rows, accuracy and value range can be merged")
+        self.counts += other.counts
+        return self
+
+    def quantiles(self, q):
+        """
+        Returns an array of shape (len(q), num_rows) with the estimated quantiles q (between 0 and 1).
+        """
+        q = np.atleast_1d(q)
+        cumulative = np.cumsum(self.counts, axis=1)
+        result = np.empty((len(q), self.counts.shape[0]))
+        for row, row_cumulative in enumerate(cumulative):
+            ranks = q * (row_cumulative[-1] - 1)
+            bins = np.searchsorted(row_cumulative, ranks, side="right")
+            # Midpoint of the bin (gamma^(i-1), gamma^i] in terms of relative error
+            upper = self.gamma ** (bins - 1 + self.offset)
+            result[:, row] = np.where(bins == 0, 0.0, 2 * upper / (self.gamma + 1))
+        return result
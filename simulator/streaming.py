@@ -0,0 +1,125 @@
+import os
+from functools import partial
+
+import numpy as np
+
+from .engine import calculate_invested_capital, run_monte_carlo_simulation
+from .parallel import DEFAULT_CHUNK_SIZE, process_pool, split_into_chunks
+from .rng import spawn_seed_sequences
+from .stats import QuantileSketch
+
+DEFAULT_PERCENTILES = (5, 10, 25, 50, 75, 90, 95)
+# Chunk size with quasi_random: Sobol sequences are only balanced for powers of two
+QMC_CHUNK_SIZE = 8192
+# Above this many paths the dashboard does not keep the full path matrix, only the summaries it shows
+MAX_IN_MEMORY_SIMULATIONS = 5000
+
+
+def _summarize_chunk(args, keep_final_values=True, goal=None, antithetic=False, quasi_random=False):
+    success_counts = None
+    if goal is not None:
+        success_counts = np.zeros(args[2] * 12 + 1, dtype=np.int64)
+    paths = run_monte_carlo_simulation(*args, goal=goal, success_counts=success_counts, antithetic=antithetic,
+                                       quasi_random=quasi_random)
+    yearly_values = paths[::12]
+    sketch = QuantileSketch(num_rows=yearly_values.shape[0])
+    sketch.add(yearly_values)
+    return (paths[-1].copy() if keep_final_values else len(paths[-1])), sketch, success_counts
+
+
+def iter_streaming_simulation(initial_capital, monthly_contribution, years,
+                              expected_return, volatility, num_simulations, annual_fee,
+                              contribution_increase_rate, seed=None, percentiles=DEFAULT_PERCENTILES,
+                              num_workers=1, chunk_size=None, dtype=np.float64,
+                              backend="numpy", keep_final_values=True, goal=None, antithetic=False,
+                              quasi_random=False):
+    """
+    Progressive form of run_streaming_simulation: yields a summary of all paths simulated so far after every
+    chunk, with "num_completed" holding the number of those paths. The last summary is the full result.
+    Closing the generator early cancels the chunks that have not started yet.
+    """
+    if chunk_size is None:
+        chunk_size = QMC_CHUNK_SIZE if quasi_random else DEFAULT_CHUNK_SIZE
+    chunk_sizes = split_into_chunks(num_simulations, chunk_size)
+    chunk_seeds = spawn_seed_sequences(seed, len(chunk_sizes))
+    chunk_args = [
+        (initial_capital, monthly_contribution, years, expected_return, volatility,
+         size, annual_fee, contribution_increase_rate, chunk_seed, dtype, backend)
+        for size, chunk_seed in zip(chunk_sizes, chunk_seeds)
+    ]
+
+    final_values = np.empty(num_simulations, dtype=dtype) if keep_final_values else None
+    summarize_chunk = partial(_summarize_chunk, keep_final_values=keep_final_values, goal=goal,
+                              antithetic=antithetic, quasi_random=quasi_random)
+    success_counts = np.zeros(years * 12 + 1, dtype=np.int64) if goal is not None else None
+    sketch = QuantileSketch(num_rows=years + 1)
+    invested_capital_path = calculate_invested_capital(
+        initial_capital, monthly_contribution, years, contribution_increase_rate
+    )
+
+    # Like run_parallel_monte_carlo_simulation, never start more workers than there are chunks
+    num_workers = min(num_workers or os.cpu_count() or 1, len(chunk_args))
+    executor = None
+    if num_workers > 1:
+        executor = process_pool(num_workers)
+        chunk_summaries = executor.map(summarize_chunk, chunk_args)
+    else:
+        chunk_summaries = map(summarize_chunk, chunk_args)
+
+    try:
+        completed = 0
+        for chunk_final_values, chunk_sketch, chunk_success_counts in chunk_summaries:
+            if keep_final_values:
+                final_values[completed:completed + len(chunk_final_values)] = chunk_final_values
+                completed += len(chunk_final_values)
+            else:
+                completed += chunk_final_values
+            sketch.merge(chunk_sketch)
+            if goal is not None:
+                success_counts += chunk_success_counts
+            yield {
+                "final_values": final_values[:completed] if keep_final_values else None,
+                "percentiles": tuple(percentiles),
+                "year_percentiles": sketch.quantiles(np.asarray(percentiles) / 100),
+                "invested_capital_path": invested_capital_path,
+                "num_completed": completed,
+                "success_probability": success_counts / completed if goal is not None else None,
+            }
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def run_streaming_simulation(initial_capital, monthly_contribution, years,
+                             expected_return, volatility, num_simulations, annual_fee,
+                             contribution_increase_rate, seed=None, percentiles=DEFAULT_PERCENTILES,
+                             num_workers=1, chunk_size=None, dtype=np.float64,
+                             backend="numpy", keep_final_values=True, goal=None, antithetic=False,
+                             quasi_random=False):
+    """
+    Runs the simulation chunk by chunk and keeps only what the dashboard displays.
+
+    At most one chunk of paths (chunk_size paths per worker) is held in memory at a time. chunk_size defaults
+    to DEFAULT_CHUNK_SIZE, or to the power of two QMC_CHUNK_SIZE with quasi_random.
+    The chunking and seeds match run_parallel_monte_carlo_simulation, so the final values are identical.
+    dtype sets the precision of the chunk path matrices and the final values, backend the engine backend
+    (see run_monte_carlo_simulation).
+    Returns a dict with the final values, the yearly percentile bands of shape (len(percentiles), years + 1)
+    and the invested capital path.
+
+    With keep_final_values=False the final values are not collected ("final_values" is None), so memory does
+    not grow with num_simulations at all. The final-value percentiles are then the last column of
+    "year_percentiles", from the merged QuantileSketch of all chunks with its bounded relative error.
+
+    With a goal (see run_monte_carlo_simulation) "success_probability" holds the fraction of paths at or
+    above it in every month (length years * 12 + 1), counted by the engine chunk by chunk.
+    With antithetic=True every chunk consists of antithetic pairs, with quasi_random=True every chunk is its own
+    scrambled Sobol sequence, scrambled by the chunk's seed (see run_monte_carlo_simulation).
+    """
+    for summary in iter_streaming_simulation(
+        initial_capital, monthly_contribution, years, expected_return, volatility, num_simulations, annual_fee,
+        contribution_increase_rate, seed, percentiles, num_workers, chunk_size, dtype, backend,
+        keep_final_values, goal, antithetic, quasi_random
+    ):
+        pass
+    return summary
@@ -0,0 +1,77 @@
+import numpy as np
+
+from .engine import calculate_invested_capital, contribution_schedule, inflation_discount_factors
+from .stats import partition_quantiles
+from .streaming import DEFAULT_PERCENTILES, run_streaming_simulation
+
+
+def final_value_statistics(final_values):
+    """
+    Returns the headline metrics of the dashboard: the median and the 10th and 90th percentile of the final values.
+    """
+    worst_case, median_final, best_case = partition_quantiles(final_values, [0.1, 0.5, 0.9])
+    return {
+        "median_final": median_final,
+        "worst_case": worst_case,
+        "best_case": best_case,
+    }
+
+
+def success_probability(values, goal):
+    """
+    Returns the fraction of paths at or above goal in every row of values (shape (rows, num_simulations)).
+    goal is one amount or one per row. The engine counts this for every month during the run (see the goal
+    argument of run_monte_carlo_simulation); this is for values that are already in memory.
+    """
+    return np.count_nonzero(values >= np.reshape(goal, (-1, 1)), axis=1) / values.shape[1]
+
+
+def summary_row(params, final_values, percentiles=DEFAULT_PERCENTILES):
+    """
+    Builds a flat dict with the scenario parameters and the summary metrics of its nominal final values,
+    including the final-value percentiles and the invested capital. With params["inflation_rate"] > 0
+    all values are in today's money, as in the dashboard.
+    """
+    years = params["years"]
+    discount = inflation_discount_factors(years, params.get("inflation_rate", 0.0))[-1]
+    final_values = final_values / discount
+
+    row = dict(params)
+    # The headline metrics and the percentiles share one partition of the final values
+    quantiles = partition_quantiles(final_values, np.concatenate([[0.1, 0.5, 0.9], np.asarray(percentiles) / 100]))
+    row["median_final"], row["worst_case"], row["best_case"] = quantiles[1], quantiles[0], quantiles[2]
+    row["mean_final"] = final_values.mean()
+    for percentile, value in zip(percentiles, quantiles[3:]):
+        row[f"p{percentile}_final"] = value
+    row["total_invested"] = calculate_invested_capital(
+        params["initial_capital"], params["monthly_contribution"], years, params["contribution_increase_rate"]
+    )[-1] / discount
+    row["last_monthly_contribution"] = contribution_schedule(params["monthly_contribution"], years,
+                                                             params["contribution_increase_rate"])[-1]
+    return row
+
+
+def summarize_scenario(initial_capital, monthly_contribution, years, expected_return, volatility,
+                       num_simulations, annual_fee, contribution_increase_rate, seed=None, inflation_rate=0.0,
+                       percentiles=DEFAULT_PERCENTILES, num_workers=1, dtype=np.float64, backend="numpy"):
+    """
+    Runs one scenario in streaming mode and returns its summary_row.
+    """
+    summary = run_streaming_simulation(
+        initial_capital, monthly_contribution, years, expected_return, volatility, num_simulations,
+        annual_fee, contribution_increase_rate, seed, percentiles=percentiles, num_workers=num_workers,
+        dtype=dtype, backend=backend
+    )
+    params = {
+        "initial_capital": initial_capital,
+        "monthly_contribution": monthly_contribution,
+        "years": years,
+        "expected_return": expected_return,
+        "volatility": volatility,
+        "num_simulations": num_simulations,
+        "annual_fee": annual_fee,
+        "contribution_increase_rate": contribution_increase_rate,
+        "seed": seed,
+        "inflation_rate": inflation_rate,
+    }
+    return summary_row(params, summary["final_values"], percentiles)
@@ -0,0 +1,115 @@
+import numpy as np
+
+from .rng import draw_year_returns, make_rng
+
+
+def _advance_growth(capital_factors, contribution_factors, start_year, monthly_return, monthly_volatility,
+                    annual_fee, rng, shocks, antithetic):
+    # Fills the factors from start_year on, continuing from the growth reached after start_year
+    num_simulations = capital_factors.shape[1]
+    growth = capital_factors[start_year].copy()
+    for year in range(start_year, len(contribution_factors)):
+        random_returns = draw_year_returns(rng, shocks, year, monthly_return, monthly_volatility, num_simulations,
+                                           antithetic)
+        for month in range(12):
+            growth *= 1 + random_returns[month]
+            # The contribution is paid after the month's return and before the year-end fee
+            contribution_factors[year] += 1 / growth
+        growth *= (1 - annual_fee)
+        capital_factors[year + 1] = growth
+
+
+def compute_growth_factors(years, expected_return, volatility, num_simulations, annual_fee, seed=None,
+                           shocks=None, antithetic=False):
+    """
+    Simulates the market once and returns per-path growth factors from which the portfolio value follows
+    linearly for any initial capital and contribution stream (see superpose_yearly_values):
+
+    - "capital_factors" (years + 1, num_simulations): what 1 € invested at the start is worth after each year
+    - "contribution_factors" (years, num_simulations): sum over the months of each year of 1 / (growth up to
+      the month the contribution is paid), i.e. the value of that year's 1 €/month contributions, discounted
+      to the start with the path's own growth
+
+    The draws match run_monte_carlo_simulation for the same seed or shocks (and antithetic setting). When drawing
+    from seed, the generator state is kept under "rng_state" so that extend_growth_factors can continue the stream.
+    """
+    capital_factors = np.empty((years + 1, num_simulations))
+    capital_factors[0] = 1.0
+    contribution_factors = np.zeros((years, num_simulations))
+
+    rng = make_rng(seed)
+    _advance_growth(capital_factors, contribution_factors, 0, expected_return / 12, volatility / np.sqrt(12),
+                    annual_fee, rng, shocks, antithetic)
+
+    growth_factors = {"capital_factors": capital_factors, "contribution_factors": contribution_factors}
+    if shocks is None:
+        growth_factors["rng_state"] = rng.bit_generator.state
+    return growth_factors
+
+
+def extend_growth_factors(growth_factors, years, expected_return, volatility, annual_fee, shocks=None,
+                          antithetic=False):
+    """
+    Returns the growth factors for a different horizon without recomputing the years already simulated.
+    Shorter horizons are a slice of the existing factors. Longer horizons continue from the last year's growth
+    with the stored generator state, or with the given shocks (which must cover the new horizon), so the
+    cost is proportional to the added years. The result equals compute_growth_factors for the new horizon.
+    antithetic must be the same as for the original factors.
+    """
+    capital_factors = growth_factors["capital_factors"]
+    contribution_factors = growth_factors["contribution_factors"]
+    current_years = len(contribution_factors)
+    if years == current_years:
+        return growth_factors
+    if years < current_years:
+        # The generator state belongs to the longer horizon, so a slice cannot be continued from seed
+        return {"capital_factors": capital_factors[:years + 1], "contribution_factors": contribution_factors[:years]}
+    if shocks is None and "rng_state" not in growth_factors:
+        raise ValueError("These growth factors were computed from shocks (or truncated); pass shocks to extend them")
+
+    num_simulations = capital_factors.shape[1]
+    extended_capital_factors = np.empty((years + 1, num_simulations))
+    extended_capital_factors[:current_years + 1] = capital_factors
+    extended_contribution_factors = np.zeros((years, num_simulations))
+    extended_contribution_factors[:current_years] = contribution_factors
+
+    rng = None
+    if shocks is None:
+        rng = make_rng()
+        rng.bit_generator.state = growth_factors["rng_state"]
+    _advance_growth(extended_capital_factors, extended_contribution_factors, current_years, expected_return / 12,
+                    volatility / np.sqrt(12), annual_fee, rng, shocks, antithetic)
+
+    extended = {"capital_factors": extended_capital_factors, "contribution_factors": extended_contribution_factors}
+    if shocks is None:
+        extended["rng_state"] = rng.bit_generator.state
+    return extended
+
+
+def yearly_contributions(monthly_contribution, years, contribution_increase_rate):
+    return monthly_contribution * (1 + contribution_increase_rate) ** np.arange(years)
+
+
+def superpose_yearly_values(growth_factors, initial_capital, monthly_contribution, contribution_increase_rate):
+    """
+    Returns the portfolio value at the end of every year, shape (years + 1, num_simulations), equal to
+    run_monte_carlo_simulation(...)[::12] up to rounding. Costs O(years x num_simulations), no simulation.
+    """
+    capital_factors = growth_factors["capital_factors"]
+    contribution_factors = growth_factors["contribution_factors"]
+    contributions = yearly_contributions(monthly_contribution, len(contribution_factors), contribution_increase_rate)
+
+    discounted_capital = np.empty_like(capital_factors)
+    discounted_capital[0] = initial_capital
+    np.cumsum(contributions[:, np.newaxis] * contribution_factors, axis=0, out=discounted_capital[1:])
+    discounted_capital[1:] += initial_capital
+    return capital_factors * discounted_capital
+
+
+def superpose_final_values(growth_factors, initial_capital, monthly_contribution, contribution_increase_rate):
+    """
+    Returns only the final portfolio values as one dot product over the years, O(years x num_simulations).
+    """
+    contribution_factors = growth_factors["contribution_factors"]
+    contributions = yearly_contributions(monthly_contribution, len(contribution_factors), contribution_increase_rate)
+    return growth_factors["capital_factors"][-1] * (initial_capital + contributions @ contribution_factors)
@@ -0,0 +1,93 @@
+import numpy as np
+
+from .superposition import compute_growth_factors, superpose_final_values
+
+SUMMARY_QUANTILES = {"worst_case": 0.1, "median_final": 0.5, "best_case": 0.9}
+
+
+def expected_final_value(initial_capital, monthly_contribution, years, expected_return, annual_fee,
+                         contribution_increase_rate):
+    """
+    Exact expected final value of the simulation. The monthly returns are independent with mean
+    expected_return / 12 and the final value is linear in each of them, so its expectation is the
+    deterministic run with every return equal to that mean.
+    """
+    growth_factors = compute_growth_factors(years, expected_return, 0.0, 1, annual_fee)
+    return superpose_final_values(growth_factors, initial_capital, monthly_contribution,
+                                  contribution_increase_rate)[0]
+
+
+def weighted_quantiles(values, weights, quantiles):
+    """
+    Quantiles of the distribution that puts weight weights[i] on values[i]. Weights may be negative,
+    as with control variates; the first value at which the cumulative weight reaches q is returned.
+    """
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    cumulative /= cumulative[-1]
+    indices = np.array([np.argmax(cumulative >= q) for q in np.atleast_1d(quantiles)])
+    return values[order][indices]
+
+
+def control_variate_weights(control, control_mean):
+    """
+    Weights of the control-variate (regression) estimator of a distribution: they sum to one and reweight
+    the paths so that the weighted mean of control equals its known mean control_mean.
+    """
+    centered = control - control.mean()
+    return 1 / len(control) + (control_mean - control.mean()) * centered / np.sum(centered ** 2)
+
+
+def effective_sample_size_gain(final_values, control, quantile_values, antithetic=False):
+    """
+    First-order effective sample-size gain for each quantile: the variance of the plain empirical CDF at the
+    quantile, p(1 - p) / n, divided by its variance with the control variate (and antithetic pairs). With pairs,
+    the pair averages of the indicator and the control are the independent units, so the gain is
+    p(1 - p) / (2 Var(pair indicator) (1 - rho^2)), with rho their correlation with the pair control.
+    """
+    if antithetic:
+        # Pairs are (i, i + half); an unpaired middle path of an odd count is left out
+        half = len(final_values) // 2
+        offset = len(final_values) - half
+        final_values = (final_values[:half], final_values[offset:])
+        control = (control[:half] + control[offset:]) / 2
+    gains = []
+    for value in quantile_values:
+        if antithetic:
+            indicator = ((final_values[0] <= value).astype(float) + (final_values[1] <= value)) / 2
+            p = indicator.mean()
+            plain_variance = p * (1 - p) / 2
+        else:
+            indicator = (final_values <= value).astype(float)
+            p = indicator.mean()
+            plain_variance = p * (1 - p)
+        rho = np.corrcoef(indicator, control)[0, 1]
+        gains.append(plain_variance / (indicator.var() * (1 - rho ** 2)))
+    return np.array(gains)
+
+
+def variance_reduced_statistics(final_values, expected_value, antithetic=False):
+    """
+    Estimates the headline metrics (see final_value_statistics) with the final value as control variate,
+    using its analytically known expectation expected_value. With antithetic=True the paths are treated as
+    antithetic pairs (i, i + half) and an unpaired middle path of an odd count is left out.
+    Also returns "effective_sample_size_gain": for each metric, how many times more independent paths
+    plain Monte Carlo would need for the same accuracy (first-order estimate).
+    """
+    if antithetic:
+        # The control variate is applied to the pairs, the independent units of an antithetic sample
+        half = len(final_values) // 2
+        offset = len(final_values) - half
+        final_values = np.concatenate([final_values[:half], final_values[offset:]])
+        pair_weights = control_variate_weights((final_values[:half] + final_values[half:]) / 2, expected_value)
+        weights = np.concatenate([pair_weights, pair_weights]) / 2
+    else:
+        weights = control_variate_weights(final_values, expected_value)
+    quantiles = list(SUMMARY_QUANTILES.values())
+    estimates = weighted_quantiles(final_values, weights, quantiles)
+
+    gains = effective_sample_size_gain(final_values, final_values, estimates, antithetic)
+
+    statistics = dict(zip(SUMMARY_QUANTILES, estimates))
+    statistics["effective_sample_size_gain"] = dict(zip(SUMMARY_QUANTILES, gains))
+    return statistics